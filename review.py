@@ -1,36 +1,294 @@
 import argparse
+import asyncio
+import functools
+import hashlib
 import sys
-import requests
 import json
 import os
-import glob
 import sqlite3
+import random
 import re
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.live import Live
-from rich.spinner import Spinner
-from rich.panel import Panel
-from rich.syntax import Syntax
-
-def get_ollama_review(code_snippet: str, custom_rules: str = ""):
+import time
+import tempfile
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson parses the per-token JSON frames several times faster than the
+# stdlib and accepts bytes directly; fall back to stdlib json if absent.
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+# Optional native directory walker (Rust 'ignore' crate bindings).
+try:
+    from ignore import Walk as _IgnoreWalk
+except ImportError:
+    _IgnoreWalk = None
+
+# Rich is imported lazily: pre-commit (--no-emoji) runs never pay its
+# import cost (hundreds of ms of cold start), and normal runs only load
+# it once the console is actually needed.
+Console = Group = Markdown = Live = Text = None
+
+
+def _load_rich():
+    global Console, Group, Markdown, Live, Text
+    if Console is None:
+        from rich.console import Console as _Console, Group as _Group
+        from rich.live import Live as _Live
+        from rich.markdown import Markdown as _Markdown
+        from rich.text import Text as _Text
+        Console, Group, Live = _Console, _Group, _Live
+        Markdown, Text = _Markdown, _Text
+
+
+class _PlainConsole:
     """
-    Sends a code snippet to Ollama for review and streams the response in real-time.
+    Minimal Console stand-in for --no-emoji runs so Rich never gets
+    imported: strips the styling markup tags and prints plainly.
     """
-    OLLAMA_URL = "http://localhost:11434/api/generate"
-    
-    custom_rules_section = ""
-    if custom_rules:
-        custom_rules_section = f"""
----
-ADDITIONAL CUSTOM RULES:
-The following rules are critical for our team. 
-Please enforce them with high priority:
-{custom_rules}
----
-"""
 
-    prompt = f"""You are 'CodeGuardian', an elite software engineering assistant.
+    _MARKUP_RE = re.compile(
+        r'\[/?(?:bold|italic|dim|cyan|red|green|yellow|magenta|blue|white)[^\]]*\]|\[/\]')
+
+    def print(self, *objects, **kwargs):
+        text = " ".join(str(obj) for obj in objects)
+        print(self._MARKUP_RE.sub('', text))
+
+
+class _StreamRenderer:
+    """
+    Incremental Markdown rendering for streamed reviews: completed
+    paragraphs are parsed as Markdown exactly once, only the trailing
+    partial paragraph is re-rendered as plain text on each update.
+    """
+
+    def __init__(self):
+        self.finalized = []
+        self.pending = ""
+
+    def append(self, chunk: str):
+        self.pending += chunk
+        if "\n\n" in self.pending:
+            done, _, self.pending = self.pending.rpartition("\n\n")
+            self.finalized.append(Markdown(done))
+
+    def renderable(self):
+        return Group(*self.finalized, Text(self.pending))
+
+# Backend configuration, overridable via --backend / --base-url / --model.
+# "ollama" talks to /api/generate; "vllm" talks to an OpenAI-compatible
+# /v1/chat/completions endpoint, which batches concurrent requests
+# server-side.
+BACKEND = "ollama"
+BASE_URL = "http://localhost:11434"
+MODEL = "qwen2:0.5b"
+
+
+def _request_payload(prompt: str, stream: bool):
+    """Returnează (url, corp JSON) pentru backend-ul activ."""
+    if BACKEND == "vllm":
+        url = f"{BASE_URL}/v1/chat/completions"
+        data = {
+            "model": MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": stream
+        }
+    else:
+        url = f"{BASE_URL}/api/generate"
+        data = {"model": MODEL, "prompt": prompt, "stream": stream}
+    return url, data
+
+
+# Fast path for Ollama frames: pull the "response" value straight out of
+# the bytes without a full JSON parse (and without decoding the line).
+_RESP_RE = re.compile(rb'"response":"((?:[^"\\]|\\.)*)"')
+
+
+def _extract_stream_chunk(line: bytes) -> str:
+    """Extrage textul dintr-o linie de stream (NDJSON la Ollama, SSE la vLLM)."""
+    if BACKEND == "vllm":
+        if not line.startswith(b"data:"):
+            return ""
+        payload = line[5:].strip()
+        if payload == b"[DONE]":
+            return ""
+        chunk = _json.loads(payload)
+        return chunk["choices"][0]["delta"].get("content") or ""
+    m = _RESP_RE.search(line)
+    if m is not None:
+        raw = m.group(1)
+        # Escape-free tokens (the overwhelmingly common case) need no
+        # JSON unescaping at all; anything else takes the full parse.
+        if b'\\' not in raw:
+            return raw.decode('utf-8')
+    chunk = _json.loads(line)
+    return chunk.get("response", "")
+
+
+def _iter_ndjson_body(prompt: str, stream: bool):
+    """
+    Generates the Ollama request body in chunks so the multi-KB prompt is
+    never duplicated into one big serialized JSON string: the envelope is
+    emitted first, then the prompt is JSON-escaped slice by slice.
+    """
+    yield (b'{"model": ' + json.dumps(MODEL).encode('ascii')
+           + b', "stream": ' + (b'true' if stream else b'false')
+           + b', "prompt": "')
+    escape = json.encoder.encode_basestring_ascii
+    for i in range(0, len(prompt), 65536):
+        # encode_basestring_ascii returns a quoted string; strip the quotes
+        yield escape(prompt[i:i + 65536])[1:-1].encode('ascii')
+    yield b'"}'
+
+
+def _extract_full_response(body: dict) -> str:
+    """Extrage textul complet dintr-un răspuns non-streaming."""
+    if BACKEND == "vllm":
+        return body["choices"][0]["message"]["content"] or ""
+    return body.get("response", "")
+
+# One keep-alive session reused for every request so directory mode
+# doesn't pay a TCP handshake per file. The pool is sized to match the
+# concurrency of the parallel directory path. requests itself is only
+# imported on first use, like rich: invocations that never reach the
+# network (--help, --manage, full cache hits) skip its import cost.
+requests = None
+_SESSION = None
+
+
+def _get_session():
+    """Importă requests și construiește sesiunea partajată la primul apel."""
+    global requests, _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+        _SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        _SESSION.headers["Connection"] = "keep-alive"
+    return _SESSION
+
+# Retry policy for transient failures: connection establishment and
+# timeouts only — a stream failing mid-flight is never retried, since
+# that would duplicate already-yielded output.
+_RETRY_ATTEMPTS = 4
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 10.0
+
+
+def _post_with_retry(url, kwargs_factory, **post_kwargs):
+    """
+    POSTs with jittered exponential backoff so a flaky `ollama serve`
+    restart doesn't abort a long directory run. kwargs_factory rebuilds
+    the body per attempt (the streamed body generator is single-use).
+    """
+    session = _get_session()
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            return session.post(url, **kwargs_factory(), **post_kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == _RETRY_ATTEMPTS - 1:
+                raise
+            delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * (2 ** attempt))
+            time.sleep(delay * (0.5 + random.random() / 2))
+
+# Cap on concurrent Ollama requests in directory mode so the server
+# doesn't thrash when many files are fired at once. Overridable via the
+# CODEPASS_CONCURRENCY environment variable.
+try:
+    MAX_CONCURRENCY = max(1, int(os.environ.get("CODEPASS_CONCURRENCY", "4")))
+except ValueError:
+    MAX_CONCURRENCY = 4
+
+# Minimum time between live redraws; matches Live(refresh_per_second=8),
+# so faster token chunks don't build renderables that are never painted.
+_DRAW_INTERVAL = 1 / 8
+
+# On-disk review cache: identical code/rules/model combinations skip the
+# model entirely. Disabled with --no-cache.
+CACHE_DIR = Path.home() / ".cache" / "codepass"
+CACHE_ENABLED = True
+
+
+def _cache_path(code_snippet: str, custom_rules: str) -> Path:
+    # blake2b e mai rapid decât sha256 pe intrări mari; nu avem nevoie
+    # de rezistență criptografică, doar de o cheie de cache stabilă
+    key = hashlib.blake2b(
+        f"{MODEL}\0{custom_rules}\0{code_snippet}".encode(), digest_size=16
+    ).hexdigest()
+    return CACHE_DIR / f"{key}.md"
+
+
+def _cache_store(cache_path: Path, review_text: str):
+    """Scrie review-ul în cache atomic (tempfile + os.replace)."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(review_text)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+# Index of {absolute path: {mtime_ns, size, key}} so unchanged files can
+# reuse their cached review without even being read and hashed.
+_INDEX_PATH = CACHE_DIR / "index.json"
+
+
+def _load_index() -> dict:
+    try:
+        return json.loads(_INDEX_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: dict):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _INDEX_PATH)
+    except OSError:
+        pass
+
+
+def cached_review(code_snippet: str, custom_rules: str = "", stream: bool = True):
+    """
+    Wraps get_ollama_review with the on-disk cache: yields the stored review
+    on a hit, otherwise streams from Ollama and stores the result.
+    """
+    if not CACHE_ENABLED:
+        yield from get_ollama_review(code_snippet, custom_rules, stream=stream)
+        return
+
+    cache_path = _cache_path(code_snippet, custom_rules)
+    if cache_path.is_file():
+        yield cache_path.read_text(encoding='utf-8')
+        return
+
+    parts = []
+    for chunk in get_ollama_review(code_snippet, custom_rules, stream=stream):
+        parts.append(chunk)
+        yield chunk
+
+    review_text = "".join(parts)
+    # Don't cache error output (connection failures etc.)
+    if review_text and "[bold red]" not in review_text:
+        _cache_store(cache_path, review_text)
+
+
+# Static prompt pieces, built once at import time; build_prompt only
+# splices the rules section and the code snippet between them.
+_PROMPT_PREFIX = """You are 'CodeGuardian', an elite software engineering assistant.
 Return the response ONLY in Markdown format.
 Analyze the code on the following dimensions:
 
@@ -45,36 +303,132 @@ For EACH issue found, provide:
 * **[Explanation]:** Why it's a problem.
 * **[Remediation Effort]:** Low / Medium / High.
 * **[Suggested Fix (diff)]:** (if possible)
-{custom_rules_section}
+"""
+
+_PROMPT_MIDDLE = """
 Begin analysis on the following code snippet:
 ---
 ```python
-{code_snippet}
+"""
+
+_PROMPT_SUFFIX = """
 ```
 ---
 """
 
-    data = {
-        "model": "qwen2:0.5b",
-        "prompt": prompt,
-        "stream": True
-    }
-    
+
+# Regulile nu se schimbă în timpul unui run, deci prefixul se
+# construiește o singură dată oricâte fișiere revizuim
+@functools.lru_cache(maxsize=4)
+def _prompt_prefix(custom_rules: str) -> str:
+    """Partea de prompt dinaintea codului, fixă pentru un set de reguli."""
+    return _PROMPT_PREFIX + _rules_section(custom_rules) + _PROMPT_MIDDLE
+
+
+def _rules_section(custom_rules: str) -> str:
+    """Construiește secțiunea de reguli custom a promptului."""
+    if not custom_rules:
+        return ""
+    return f"""
+---
+ADDITIONAL CUSTOM RULES:
+The following rules are critical for our team.
+Please enforce them with high priority:
+{custom_rules}
+---
+"""
+
+
+def build_prompt(code_snippet: str, custom_rules: str = "") -> str:
+    """Construiește promptul complet trimis modelului."""
+    return _prompt_prefix(custom_rules) + code_snippet + _PROMPT_SUFFIX
+
+
+def get_ollama_review(code_snippet: str, custom_rules: str = "", stream: bool = True):
+    """
+    Sends a code snippet to Ollama for review and streams the response in real-time.
+    When the caller doesn't need incremental display (stream=False), a single
+    non-streaming request is made and parsed with one json() call.
+    """
+    prompt = build_prompt(code_snippet, custom_rules)
+    url, data = _request_payload(prompt, stream)
+
+    # For Ollama the body is streamed chunk-wise so the prompt isn't
+    # copied into a second full-size JSON string; vLLM's nested message
+    # payload goes through the normal json= path. A factory is used so
+    # each retry attempt gets a fresh body generator.
+    if BACKEND == "ollama":
+        def _kwargs_factory():
+            return {"data": _iter_ndjson_body(prompt, stream),
+                    "headers": {"Content-Type": "application/json"}}
+    else:
+        # Serialized once with orjson when available (bytes out), so
+        # requests doesn't re-encode the payload with stdlib json.
+        body = _json.dumps(data)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        def _kwargs_factory():
+            return {"data": body,
+                    "headers": {"Content-Type": "application/json"}}
+
     received_data = False
     try:
-        with requests.post(OLLAMA_URL, json=data, stream=True, timeout=180) as response:
+        if not stream:
+            response = _post_with_retry(url, _kwargs_factory, timeout=180)
             response.raise_for_status()
-            for line in response.iter_lines():
-                if line:
-                    received_data = True
-                    try:
-                        chunk = json.loads(line.decode('utf-8'))
-                        content_chunk = chunk.get("response", "")
+            # Same contract as the streaming path: a malformed body
+            # yields error text instead of raising out of the generator
+            try:
+                content = _extract_full_response(response.json())
+            except (ValueError, KeyError, IndexError):
+                received_data = True
+                content = ""
+                yield f"\n[bold red]❌ Error: Unexpected response format from {BACKEND} backend at {BASE_URL}[/bold red]\n"
+            if content:
+                received_data = True
+                yield content
+        else:
+            with _post_with_retry(url, _kwargs_factory, stream=True, timeout=180) as response:
+                response.raise_for_status()
+                # Read big chunks and split lines ourselves: far fewer
+                # Python-level calls than iter_lines() on fast streams.
+                # The residue lives in a bytearray and completed lines
+                # come out of one memoryview per chunk, so a long line
+                # arriving in pieces never triggers quadratic re-copies.
+                buf = bytearray()
+                for content in response.iter_content(chunk_size=65536):
+                    buf += content
+                    nl = buf.rfind(b"\n")
+                    if nl == -1:
+                        continue
+                    view = memoryview(buf)[:nl]
+                    start = 0
+                    while (end := buf.find(b"\n", start, nl + 1)) != -1:
+                        line = bytes(view[start:end])
+                        start = end + 1
+                        if not line:
+                            continue
+                        received_data = True
+                        try:
+                            content_chunk = _extract_stream_chunk(line)
+                        except (ValueError, KeyError, IndexError):
+                            content_chunk = ""
                         if content_chunk:
                             yield content_chunk
-                    except json.JSONDecodeError:
-                        pass
-        
+                    view.release()
+                    del buf[:nl + 1]
+                if buf.strip():
+                    buf = bytes(buf)
+                    received_data = True
+                    try:
+                        content_chunk = _extract_stream_chunk(buf)
+                    except (ValueError, KeyError, IndexError):
+                        content_chunk = ""
+                    if content_chunk:
+                        yield content_chunk
+
+
         if not received_data:
             yield "\n[bold red]❌ Error: No response received from Ollama.[/bold red]\n"
             yield "[yellow]💡 Troubleshooting tips:[/yellow]\n"
@@ -86,17 +440,347 @@ Begin analysis on the following code snippet:
         yield "\n[bold red]❌ Error: Ollama request timed out (180s).[/bold red]\n"
         yield "[yellow]The model may still be processing. Try again or check Ollama logs.[/yellow]\n"
     except requests.exceptions.ConnectionError:
-        yield "\n[bold red]❌ Error: Cannot connect to Ollama at localhost:11434[/bold red]\n"
+        yield f"\n[bold red]❌ Error: Cannot connect to {BACKEND} backend at {BASE_URL}[/bold red]\n"
         yield "[yellow]💡 Make sure Ollama is running:[/yellow]\n"
         yield "`ollama serve`\n"
     except requests.exceptions.RequestException as e:
         yield f"\n[bold red]❌ Ollama request failed: {e}[/bold red]\n"
 
+async def stream_ollama_review(session, code_snippet: str, custom_rules: str = ""):
+    """
+    Async variant of get_ollama_review: streams response chunks from Ollama
+    over a shared aiohttp session.
+    """
+    url, data = _request_payload(build_prompt(code_snippet, custom_rules), True)
+    body = _json.dumps(data)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    async with session.post(url, data=body,
+                            headers={"Content-Type": "application/json"}) as response:
+        response.raise_for_status()
+        async for line in response.content:
+            line = line.strip()
+            if line:
+                try:
+                    content_chunk = _extract_stream_chunk(line)
+                except (ValueError, KeyError, IndexError):
+                    content_chunk = ""
+                if content_chunk:
+                    yield content_chunk
+
+# Files smaller than this get packed together into one batched prompt so
+# the fixed prompt/prefill cost is amortized across them.
+MAX_BATCH_CHARS = 6000
+
+
+def _build_batch_snippet(batch) -> str:
+    """Împachetează mai multe fișiere mici într-un singur snippet de prompt."""
+    sections = ["# You are given multiple files. Review each file independently.\n"
+                "# Start each file's review with a '## Review: <path>' heading.\n"]
+    for path, code in batch:
+        sections.append(f"\n### FILE: {path}\n```python\n{code}\n```\n")
+    return "".join(sections)
+
+
+def _split_batch_review(review_text: str, paths):
+    """Rutează secțiunile '## Review: <path>' înapoi la fișierele lor."""
+    results = {p: "" for p in paths}
+    current = None
+    for line in review_text.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith("## Review:"):
+            name = stripped[len("## Review:"):].strip().strip('`')
+            current = None
+            for p in paths:
+                if name == p or name.endswith(os.path.basename(p)):
+                    current = p
+                    break
+        if current is not None:
+            results[current] += line
+
+    # If the model ignored the heading format, don't lose the output:
+    # attach the whole text to the first file of the batch.
+    if not any(results.values()) and review_text.strip():
+        results[paths[0]] = review_text
+    return results
+
+
+def _bucket_files(pending):
+    """Grupează (path, code) în joburi: batch-uri de fișiere mici sau fișiere singure."""
+    jobs = []
+    batch, batch_chars = [], 0
+    for filepath, code in pending:
+        if len(code) > MAX_BATCH_CHARS:
+            jobs.append([(filepath, code)])
+            continue
+        if batch and batch_chars + len(code) > MAX_BATCH_CHARS:
+            jobs.append(batch)
+            batch, batch_chars = [], 0
+        batch.append((filepath, code))
+        batch_chars += len(code)
+    if batch:
+        jobs.append(batch)
+    return jobs
+
+
+# Fișierele uriașe (cod generat, vendored) ar depăși oricum contextul
+# modelului; citim doar un prefix în loc să încărcăm tot în memorie.
+try:
+    MAX_REVIEW_BYTES = max(1, int(os.environ.get("CODEPASS_MAX_BYTES", "200000")))
+except ValueError:
+    MAX_REVIEW_BYTES = 200_000
+
+
+def _read_source(filepath, size=None):
+    """Citește sursa fișierului, trunchiată la MAX_REVIEW_BYTES."""
+    if size is None:
+        size = os.stat(filepath).st_size
+    if size == 0:
+        return ""
+    if size > MAX_REVIEW_BYTES:
+        with open(filepath, 'rb') as f:
+            data = f.read(MAX_REVIEW_BYTES)
+        return data.decode('utf-8', errors='replace') + "\n# ... truncated"
+    return Path(filepath).read_text(encoding='utf-8', errors='replace')
+
+
+async def review_directory(python_files, custom_rules: str = ""):
+    """
+    Reviews many files concurrently against Ollama, capped by a semaphore so
+    the server isn't flooded. Small files are packed into batched prompts.
+    Returns {filepath: review_text_or_exception} (None for empty files).
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=180)
+    # Each in-flight review holds its connection for the whole stream,
+    # so the pool must be at least as wide as the semaphore or --jobs
+    # would silently cap out at the connector limit
+    connector = aiohttp.TCPConnector(limit=max(MAX_CONCURRENCY, 8))
+
+    index = _load_index() if CACHE_ENABLED else {}
+    stats = {}
+
+    results = {}
+    pending = []
+    for filepath in python_files:
+        abspath = os.path.abspath(filepath)
+        try:
+            st = os.stat(filepath)
+        except OSError as e:
+            results[filepath] = e
+            continue
+        stats[filepath] = st
+
+        # Unchanged since last run: reuse the cached review without
+        # reading or hashing the content at all.
+        entry = index.get(abspath)
+        if (CACHE_ENABLED and entry
+                and entry.get("mtime_ns") == st.st_mtime_ns
+                and entry.get("size") == st.st_size):
+            cache_path = CACHE_DIR / entry.get("key", "")
+            if entry.get("key") and cache_path.is_file():
+                results[filepath] = cache_path.read_text(encoding='utf-8')
+                continue
+
+        try:
+            code_to_review = _read_source(filepath, st.st_size)
+        except Exception as e:
+            results[filepath] = e
+            continue
+        if not code_to_review.strip():
+            results[filepath] = None
+            continue
+        if CACHE_ENABLED:
+            cache_path = _cache_path(code_to_review, custom_rules)
+            if cache_path.is_file():
+                results[filepath] = cache_path.read_text(encoding='utf-8')
+                index[abspath] = {"mtime_ns": st.st_mtime_ns,
+                                  "size": st.st_size,
+                                  "key": cache_path.name}
+                continue
+        pending.append((filepath, code_to_review))
+
+    jobs = _bucket_files(pending)
+
+    async def run_job(session, job):
+        if len(job) == 1:
+            snippet = job[0][1]
+        else:
+            snippet = _build_batch_snippet(job)
+
+        async with semaphore:
+            parts = []
+            async for chunk in stream_ollama_review(session, snippet, custom_rules):
+                parts.append(chunk)
+            review_text = "".join(parts)
+
+        if len(job) == 1:
+            sections = {job[0][0]: review_text}
+        else:
+            sections = _split_batch_review(review_text, [fp for fp, _ in job])
+
+        if CACHE_ENABLED:
+            for filepath, code in job:
+                if sections.get(filepath):
+                    _cache_store(_cache_path(code, custom_rules), sections[filepath])
+        return sections
+
+    if jobs:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.create_task(run_job(session, job)) for job in jobs]
+            job_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for job, result in zip(jobs, job_results):
+            if isinstance(result, Exception):
+                for filepath, _ in job:
+                    results[filepath] = result
+            else:
+                results.update(result)
+
+    if CACHE_ENABLED:
+        for filepath, code in pending:
+            review_text = results.get(filepath)
+            if isinstance(review_text, str) and review_text:
+                cache_path = _cache_path(code, custom_rules)
+                if cache_path.is_file() and filepath in stats:
+                    st = stats[filepath]
+                    index[os.path.abspath(filepath)] = {
+                        "mtime_ns": st.st_mtime_ns,
+                        "size": st.st_size,
+                        "key": cache_path.name,
+                    }
+        _save_index(index)
+
+    return results
+
+def discover_python_files(root):
+    """
+    Enumerates .py files under root. Prefers the Rust 'ignore' walker when
+    installed (multi-threaded and honours .gitignore, so vendored trees like
+    .venv/ and node_modules/ are skipped); falls back to the scandir walk.
+    """
+    if _IgnoreWalk is not None:
+        try:
+            return [str(p) for p in _IgnoreWalk(root) if str(p).endswith('.py')]
+        except Exception:
+            pass
+    return list(_iter_py_files(root))
+
+
+# Directoare care nu conțin cod de revizuit; le sărim la parcurgere.
+_SKIP_DIRS = {'__pycache__', '.git', '.venv', 'venv', 'node_modules', '.tox'}
+
+def _iter_py_files(root):
+    """Parcurge recursiv directorul și generează căile fișierelor .py."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_symlink():
+                    continue
+                elif entry.is_dir(follow_symlinks=False):
+                    if entry.name in _SKIP_DIRS:
+                        continue
+                    yield from _iter_py_files(entry.path)
+                elif entry.is_file() and entry.name.endswith('.py'):
+                    yield entry.path
+    except PermissionError:
+        pass
+
+def _consume_review(chunks_iter, *, no_emoji, console, verbose=False):
+    """
+    Drains a review chunk iterator and renders it: raw block-buffered
+    stdout in no-emoji mode, throttled Live rendering otherwise.
+    Returns the accumulated review text.
+    """
+    chunk_count = 0
+    if no_emoji:
+        parts = []
+        # Write raw UTF-8 to the underlying buffer: skips the
+        # TextIOWrapper re-encode and sidesteps console codecs. Chunks
+        # go out as they arrive (pre-commit sees output immediately);
+        # the list keeps the text for parse_and_save_review.
+        sys.stdout.flush()
+        for chunk in chunks_iter:
+            chunk_count += 1
+            parts.append(chunk)
+            sys.stdout.buffer.write(chunk.encode('utf-8', errors='replace'))
+        sys.stdout.buffer.flush()
+        full_text = "".join(parts)
+    else:
+        # The HTTP/NDJSON loop runs on a producer thread feeding a queue,
+        # so Markdown re-renders never delay the next socket read and the
+        # server is not backpressured by render cost
+        q = queue.Queue()
+
+        def _producer():
+            try:
+                for c in chunks_iter:
+                    q.put(c)
+            finally:
+                q.put(None)
+
+        threading.Thread(target=_producer, daemon=True).start()
+
+        with Live("", console=console, refresh_per_second=8) as live:
+            renderer = _StreamRenderer()
+            parts = []
+            last_draw = 0.0
+            while True:
+                try:
+                    chunk = q.get(timeout=_DRAW_INTERVAL)
+                except queue.Empty:
+                    chunk = ''
+                else:
+                    if chunk is None:
+                        break
+                    chunk_count += 1
+                    parts.append(chunk)
+                    renderer.append(chunk)
+                # Throttle redraws to the Live refresh rate
+                now = time.monotonic()
+                if now - last_draw >= _DRAW_INTERVAL:
+                    live.update(renderer.renderable())
+                    last_draw = now
+            full_text = "".join(parts)
+            # One clean whole-document parse at the end: fixes constructs
+            # that span paragraph boundaries (fenced code blocks, tables)
+            # which the incremental per-paragraph rendering splits up
+            live.update(Markdown(full_text))
+
+    if verbose:
+        console.print(f"\n[cyan]DEBUG: Received {chunk_count} chunks[/cyan]")
+    return full_text
+
+
+# Conexiune unică, partajată de init_db/parse_and_save_review/launch_gui:
+# fiecare sqlite3.connect recitește header-ul DB și schema, cost plătit
+# altfel la fiecare fișier revizuit
+_CONN = None
+
+def _get_conn():
+    """Întoarce conexiunea SQLite partajată, creând-o la primul apel."""
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect('reviews.db', check_same_thread=False)
+        # WAL + fsync relaxat: commit-uri mult mai ieftine, sigur pentru
+        # date care se pot regenera oricând dintr-un nou review
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _CONN.execute("PRAGMA synchronous=NORMAL")
+        # Temporare în RAM, cache de pagini de ~20 MB și un busy timeout
+        # ca scriitorii concurenți (GUI + writer thread) să nu pice
+        # imediat cu 'database is locked'
+        _CONN.execute("PRAGMA temp_store=MEMORY")
+        _CONN.execute("PRAGMA cache_size=-20000")
+        _CONN.execute("PRAGMA busy_timeout=5000")
+    return _CONN
+
+
 def init_db():
     """Creează tabelele bazei de date dacă nu există."""
-    conn = sqlite3.connect('reviews.db')
+    conn = _get_conn()
     cursor = conn.cursor()
-    
+
     # Tabelul pentru problemele identificate
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS issues (
@@ -118,46 +802,114 @@ def init_db():
         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY(issue_id) REFERENCES issues(id)
     )''')
+
+    # Indecși pentru interogările frecvente: dedup-ul din
+    # parse_and_save_review și listarea ordonată a comentariilor
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_issues_lookup ON issues(file_path, status, issue_desc)"
+    )
+    # Dedup-ul e impus chiar de SQLite: INSERT OR IGNORE + index unic
+    # parțial pe problemele deschise
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_issues_unique ON issues(file_path, issue_desc) WHERE status='open'"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_comments_issue ON comments(issue_id, timestamp)"
+    )
     conn.commit()
-    conn.close()
+
+# Compilat o singură dată la import: parse_and_save_review rulează o dată
+# per fișier în modul --directory, deci recompilarea/căutarea în cache-ul
+# re s-ar plăti la fiecare apel
+_SECTION_LINE_RE = re.compile(
+    r'#{1,4}\s+(?:Bug|Issue|Problem|Description)',
+    re.IGNORECASE
+)
+
+# Formatul cerut explicit în prompt (* **[Issue]:** ...): o singură
+# alternanță cu grupuri numite, parcursă cu finditer într-o singură
+# trecere peste tot textul — fără re-scanarea fiecărui bloc în parte
+_FIELD_RE = re.compile(
+    r'\*\*\[(?P<field>Issue|Explanation|Remediation Effort)\]:\*\*\s*(?P<value>[^\n]*)'
+)
+
+# Scanările pe linie din strategiile fallback: un singur search per
+# linie, fără copia .lower() și fără split-uri intermediare
+_EXPL_RE = re.compile(r'explanation[^:\n]*:\s*(.*)', re.IGNORECASE)
+_DESC_RE = re.compile(r'\*\s*\*\*Description:\*\*\s*(.*)')
+_EXPL_BOLD_RE = re.compile(r'\*\*Explanation:\*\*\s*(.*)')
+
 
 def parse_and_save_review(file_path, full_review_text):
     """Parsează textul Markdown și salvează problemele individuale în DB."""
-    conn = sqlite3.connect('reviews.db')
+    conn = _get_conn()
     cursor = conn.cursor()
     
     issues_found = []
-    
+
+    # Strategie principală: câmpurile etichetate din formatul promptului,
+    # extrase într-o singură trecere cu _FIELD_RE
+    current = None
+    for m in _FIELD_RE.finditer(full_review_text):
+        value = m.group('value').strip()
+        field = m.group('field')
+        if field == 'Issue':
+            if current and len(current['desc']) > 10:
+                issues_found.append(current)
+            current = {
+                'desc': value[:120],
+                'suggestion': "Review and fix this issue",
+                'effort': 'Medium'
+            }
+        elif current is None:
+            continue
+        elif field == 'Explanation' and value:
+            current['suggestion'] = value[:200]
+        elif field == 'Remediation Effort' and value:
+            current['effort'] = value[:50]
+    if current and len(current['desc']) > 10:
+        issues_found.append(current)
+
+    # Strategiile fallback împart textul în linii o singură dată și
+    # lucrează amândouă pe aceeași listă, cu intervale de indici în loc
+    # de split-uri repetate pe tot textul
+    lines = full_review_text.splitlines() if not issues_found else []
+
     # Strategie: Extragere bazată pe separatoare Markdown
     # Caută secțiuni care descriu probleme
     # Pattern: "## Description:", "## Bugs?:", "**Bug?**", etc.
-    
-    # Split pe secțiunile de probleme
-    sections = re.split(r'(?:^|\n)#{1,4}\s+(?:Bug|Issue|Problem|Description)', full_review_text, flags=re.MULTILINE | re.IGNORECASE)
-    
-    for section in sections[1:]:  # Skip first empty section before first match
-        lines = section.strip().split('\n')
-        if not lines:
-            continue
-        
+    section_starts = []
+    for idx, line in enumerate(lines):
+        m = _SECTION_LINE_RE.match(line)
+        if m:
+            section_starts.append((idx, m.end()))
+
+    for n, (start, marker_end) in enumerate(section_starts):
+        end = section_starts[n + 1][0] if n + 1 < len(section_starts) else len(lines)
+        # Restul liniei de header + corpul secțiunii
+        section_lines = [lines[start][marker_end:]] + lines[start + 1:end]
+
         # Extrage descrierea din primele linii
         desc = ""
         explanation = ""
-        
-        for i, line in enumerate(lines):
+
+        for line in section_lines:
             line_stripped = line.strip()
-            
+
             # Extrage descrierea din liniile care nu sunt headers
-            if not line_stripped.startswith('#') and not line_stripped.startswith('**'):
+            if not line_stripped.startswith(('#', '**')):
                 if len(desc) < 100:
                     desc += (" " + line_stripped).strip()
-            
+
             # Extrage explanation
-            if 'explanation' in line_stripped.lower() and ':' in line_stripped:
-                idx = line_stripped.lower().find(':')
-                if idx != -1:
-                    explanation = line_stripped[idx+1:].strip()
-        
+            m = _EXPL_RE.search(line_stripped)
+            if m:
+                explanation = m.group(1).strip()
+
+            # Ambele câmpuri pline: restul secțiunii nu mai aduce nimic
+            if len(desc) >= 100 and explanation:
+                break
+
         # Curăță descrierea
         desc = desc.replace('##', '').replace('**', '').strip()
         # Ia doar prima propoziție și max 120 caractere
@@ -165,7 +917,7 @@ def parse_and_save_review(file_path, full_review_text):
             if '.' in desc:
                 desc = desc.split('.')[0] + '.'
             desc = desc[:120]
-        
+
         if desc and len(desc) > 10:
             suggestion = explanation if explanation else "Review and fix this issue"
             issues_found.append({
@@ -173,56 +925,52 @@ def parse_and_save_review(file_path, full_review_text):
                 'suggestion': suggestion[:200],
                 'effort': 'Medium'
             })
-    
+
     # Fallback: dacă nu s-au găsit probleme, caută * **Description:**
-    if not issues_found:
-        lines = full_review_text.split('\n')
+    if not issues_found and lines:
         i = 0
         while i < len(lines):
             line = lines[i].strip()
-            if '**Description:**' in line and line.startswith('*'):
-                parts = line.split('**Description:**', 1)
-                if len(parts) > 1:
-                    desc = parts[1].strip()
-                    if len(desc) < 10 and i + 1 < len(lines):
-                        desc += " " + lines[i + 1].strip()
-                        i += 1
-                    
-                    if desc and len(desc) > 5:
-                        desc = desc[:150]
-                        
-                        suggestion = "Review this code issue"
-                        for j in range(i + 1, min(i + 10, len(lines))):
-                            if '**Explanation:**' in lines[j]:
-                                parts = lines[j].split('**Explanation:**', 1)
-                                if len(parts) > 1:
-                                    suggestion = parts[1].strip()[:200]
-                                break
-                        
-                        issues_found.append({
-                            'desc': desc,
-                            'suggestion': suggestion,
-                            'effort': 'Medium'
-                        })
+            m = _DESC_RE.match(line)
+            if m:
+                desc = m.group(1).strip()
+                if len(desc) < 10 and i + 1 < len(lines):
+                    desc += " " + lines[i + 1].strip()
+                    i += 1
+
+                if desc and len(desc) > 5:
+                    desc = desc[:150]
+
+                    suggestion = "Review this code issue"
+                    for j in range(i + 1, min(i + 10, len(lines))):
+                        m2 = _EXPL_BOLD_RE.search(lines[j])
+                        if m2:
+                            suggestion = m2.group(1).strip()[:200]
+                            break
+
+                    issues_found.append({
+                        'desc': desc,
+                        'suggestion': suggestion,
+                        'effort': 'Medium'
+                    })
             i += 1
     
-    # Salvează problemele în DB, evitând duplicate
-    for issue in issues_found:
-        try:
-            cursor.execute(
-                "SELECT id FROM issues WHERE file_path = ? AND issue_desc = ? AND status = 'open'",
-                (file_path, issue['desc'])
-            )
-            if not cursor.fetchone():
-                cursor.execute(
-                    "INSERT INTO issues (file_path, issue_desc, suggestion, effort, status) VALUES (?, ?, ?, ?, 'open')",
-                    (file_path, issue['desc'], issue['suggestion'], issue['effort'])
+    # Salvează problemele în DB: dedup-ul îl face idx_issues_unique prin
+    # INSERT OR IGNORE, într-o singură tranzacție (un singur fsync,
+    # indiferent câte probleme sunt) — fără SELECT preliminar
+    try:
+        rows = [
+            (file_path, issue['desc'], issue['suggestion'], issue['effort'])
+            for issue in issues_found
+        ]
+        if rows:
+            with conn:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO issues (file_path, issue_desc, suggestion, effort, status) VALUES (?, ?, ?, ?, 'open')",
+                    rows
                 )
-        except Exception as e:
-            pass
-                
-    conn.commit()
-    conn.close()
+    except Exception as e:
+        pass
 
 def launch_gui():
     """Lanșează interfața grafică Tkinter pentru managementul problemelor."""
@@ -234,7 +982,7 @@ def launch_gui():
         print("[ERROR] Tkinter is not available. GUI mode cannot run.")
         return
 
-    conn = sqlite3.connect('reviews.db')
+    conn = _get_conn()
     cursor = conn.cursor()
 
     root = tk.Tk()
@@ -261,17 +1009,44 @@ def launch_gui():
 
     tree.pack(fill="both", expand=True, side="top")
 
+    # Paginare: deschiderea GUI-ului costă O(pagină), nu O(istoric)
+    PAGE = 200
+    page_state = {'offset': 0}
+
     # Funcție pentru a încărca/reîncărca datele
     def load_issues():
-        # Șterge datele vechi
-        for i in tree.get_children():
-            tree.delete(i)
-        
-        # Încarcă datele noi din DB
-        cursor.execute("SELECT id, status, file_path, issue_desc FROM issues ORDER BY status, file_path")
-        for row in cursor.fetchall():
+        # Detașăm tabelul cât timp îl repopulăm, ca Tk să nu redeseneze
+        # la fiecare rând; ștergerea cu * e un singur apel Tcl
+        tree.pack_forget()
+        tree.delete(*tree.get_children())
+
+        # Încarcă pagina curentă din DB
+        cursor.execute(
+            "SELECT id, status, file_path, issue_desc FROM issues ORDER BY status, file_path LIMIT ? OFFSET ?",
+            (PAGE, page_state['offset'])
+        )
+        rows = cursor.fetchall()
+        for row in rows:
             tree.insert("", "end", values=row)
 
+        tree.pack(fill="both", expand=True, side="top")
+
+        cursor.execute("SELECT COUNT(*) FROM issues")
+        total = cursor.fetchone()[0]
+        first = page_state['offset'] + 1 if rows else 0
+        page_label.config(text=f"{first}-{page_state['offset'] + len(rows)} of {total}")
+
+    def prev_page():
+        if page_state['offset'] >= PAGE:
+            page_state['offset'] -= PAGE
+            load_issues()
+
+    def next_page():
+        cursor.execute("SELECT COUNT(*) FROM issues")
+        if page_state['offset'] + PAGE < cursor.fetchone()[0]:
+            page_state['offset'] += PAGE
+            load_issues()
+
     # Butoane de acțiuni
     btn_frame = ttk.Frame(main_frame, padding="10 0")
     btn_frame.pack(fill="x", side="bottom")
@@ -340,13 +1115,17 @@ def launch_gui():
     ttk.Button(btn_frame, text="Mark Resolved", command=lambda: update_status("resolved")).pack(side="left", padx=5)
     ttk.Button(btn_frame, text="Mark Wontfix", command=lambda: update_status("wontfix")).pack(side="left", padx=5)
     ttk.Button(btn_frame, text="Reload", command=load_issues).pack(side="right", padx=5)
+    ttk.Button(btn_frame, text="▶", width=3, command=next_page).pack(side="right", padx=2)
+    page_label = ttk.Label(btn_frame, text="")
+    page_label.pack(side="right", padx=2)
+    ttk.Button(btn_frame, text="◀", width=3, command=prev_page).pack(side="right", padx=2)
 
     # Încarcă datele la pornire
     load_issues()
     
-    # Asigură-te că se închide conexiunea DB la ieșire
+    # Conexiunea e partajată la nivel de modul — nu o închidem aici
     def on_closing():
-        conn.close()
+        conn.commit()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -356,10 +1135,21 @@ def main():
     """
     Reads code from a file, stdin, or a directory and sends it to Ollama for review.
     """
+    global CACHE_ENABLED, BACKEND, BASE_URL, MODEL, MAX_CONCURRENCY
+
     # Parse just the --no-emoji flag first to decide console settings
     import sys as _sys_temp
     no_emoji = '--no-emoji' in _sys_temp.argv
-    console = Console(no_color=no_emoji, force_terminal=not no_emoji)
+    if no_emoji:
+        # Block-buffer stdout so console prints don't flush per newline
+        try:
+            sys.stdout.reconfigure(line_buffering=False, write_through=False)
+        except (AttributeError, OSError):
+            pass
+        console = _PlainConsole()
+    else:
+        _load_rich()
+        console = Console(force_terminal=True)
     parser = argparse.ArgumentParser(description="AI Code Review CLI Tool")
     parser.add_argument('files', nargs='*', help="One or more files to analyze. If omitted, reads from stdin.")
     parser.add_argument('--directory', type=str, help='The directory to be recursively analyzed for .py files')
@@ -383,9 +1173,47 @@ def main():
         action='store_true',
         help="Open the GUI to manage issues and reviews"
     )
-    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Bypass the on-disk review cache and always query the model"
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['ollama', 'vllm'],
+        default='ollama',
+        help="Inference backend: ollama (default) or a vLLM OpenAI-compatible server"
+    )
+    parser.add_argument(
+        '--base-url',
+        type=str,
+        help="Base URL of the inference server (default depends on backend)"
+    )
+    parser.add_argument(
+        '--model',
+        type=str,
+        help=f"Model name to request (default: {MODEL})"
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        help=f"Max concurrent reviews in --directory mode (default: {MAX_CONCURRENCY})"
+    )
+
     args = parser.parse_args()
-    
+
+    if args.no_cache:
+        CACHE_ENABLED = False
+    if args.jobs:
+        MAX_CONCURRENCY = max(1, args.jobs)
+    BACKEND = args.backend
+    if args.base_url:
+        BASE_URL = args.base_url.rstrip('/')
+    elif BACKEND == 'vllm':
+        BASE_URL = "http://localhost:8000"
+    if args.model:
+        MODEL = args.model
+
     # Initialize database at startup
     init_db()
     
@@ -409,13 +1237,13 @@ def main():
     
     if args.verbose:
         console.print("[cyan]DEBUG: Debug Mode ON[/cyan]")
-        console.print(f"[cyan]Connecting to: http://localhost:11434/api/generate[/cyan]")
+        console.print(f"[cyan]Connecting to: {BASE_URL} (backend: {BACKEND})[/cyan]")
 
     # LOGICA IF (Noul caz pentru Pipeline)
     if args.directory:
         console.print(f"[bold cyan][DIR] Analyzing directory: {args.directory}[/bold cyan]")
         
-        python_files = glob.glob(os.path.join(args.directory, '**/*.py'), recursive=True)
+        python_files = discover_python_files(args.directory)
 
         if not python_files:
             console.print("[yellow][WARN] No .py files found in the specified directory.[/yellow]")
@@ -423,12 +1251,61 @@ def main():
 
         console.print(f"[cyan]Found {len(python_files)} Python file(s) to review[/cyan]\n")
 
+        if aiohttp is not None and len(python_files) > 1:
+            # Fan out the LLM calls concurrently; rendering happens in a
+            # final pass so the output stays ordered per file.
+            console.print(f"[cyan][PARALLEL] Reviewing up to {MAX_CONCURRENCY} files concurrently...[/cyan]")
+            results = asyncio.run(review_directory(python_files, custom_rules))
+
+            for filepath in python_files:
+                result = results[filepath]
+                console.print(f"\n[bold yellow][ANALYZE] {filepath}[/bold yellow]")
+
+                if isinstance(result, Exception):
+                    console.print(f"[red][ERROR] Error reviewing file {filepath}: {result}[/red]")
+                    continue
+                if result is None:
+                    console.print("[italic][SKIP] Empty file, skipping...[/italic]")
+                    continue
+
+                if no_emoji:
+                    # Drain the block-buffered text layer first so the
+                    # [ANALYZE] header lands before the raw review body
+                    sys.stdout.flush()
+                    sys.stdout.buffer.write(result.encode('utf-8', errors='replace'))
+                    sys.stdout.buffer.flush()
+                else:
+                    console.print(result)
+
+                console.print("[green][OK] Review complete[/green]")
+                parse_and_save_review(filepath, result)
+            return
+
+        # Prefetch file reads in the background so disk I/O overlaps with
+        # the (much slower) model stream of the file in front of it.
+        prefetch_pool = ThreadPoolExecutor(max_workers=4)
+        prefetched = {p: prefetch_pool.submit(_read_source, p) for p in python_files}
+
+        # Parse + DB insert run on their own thread, so writing file N's
+        # issues overlaps with streaming file N+1. The shared connection
+        # is opened with check_same_thread=False.
+        db_queue = queue.Queue(maxsize=4)
+
+        def _db_writer():
+            while True:
+                item = db_queue.get()
+                if item is None:
+                    break
+                parse_and_save_review(*item)
+
+        db_thread = threading.Thread(target=_db_writer, daemon=True)
+        db_thread.start()
+
         for filepath in python_files:
             console.print(f"\n[bold yellow][ANALYZE] {filepath}[/bold yellow]")
-            
+
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    code_to_review = f.read()
+                code_to_review = prefetched[filepath].result()
             except Exception as e:
                 console.print(f"[red][ERROR] Error reading file {filepath}: {e}[/red]")
                 continue
@@ -439,36 +1316,17 @@ def main():
 
             # Live reviewing with real-time streaming
             console.print("[cyan][STREAMING] Live code review starting...[/cyan]")
-            if no_emoji:
-                # For pre-commit: just collect and print without Rich formatting
-                full_text = ""
-                for chunk in get_ollama_review(code_to_review, custom_rules):
-                    full_text += chunk
-                # Print directly to stdout with error handling for encoding issues
-                try:
-                    sys.stdout.write(full_text)
-                    sys.stdout.flush()
-                except UnicodeEncodeError:
-                    # Fallback: encode with replacement characters
-                    sys.stdout.buffer.write(full_text.encode('utf-8', errors='replace'))
-                    sys.stdout.flush()
-            else:
-                # Normal mode: Live streaming display
-                with Live("", console=console, refresh_per_second=8) as live:
-                    full_text = ""
-                    chunk_count = 0
-                    for chunk in get_ollama_review(code_to_review, custom_rules):
-                        chunk_count += 1
-                        full_text += chunk
-                        # Update display in real-time
-                        live.update(full_text)
-            
-            if args.verbose:
-                console.print(f"\n[cyan]DEBUG: Received {chunk_count} chunks[/cyan]")
-            
+            full_text = _consume_review(
+                cached_review(code_to_review, custom_rules, stream=not no_emoji),
+                no_emoji=no_emoji, console=console, verbose=args.verbose)
+
             console.print("[green][OK] Review complete[/green]")
-            parse_and_save_review(filepath, full_text)
-    
+            db_queue.put((filepath, full_text))
+
+        db_queue.put(None)
+        db_thread.join()
+        prefetch_pool.shutdown(wait=False)
+
     # ELSE LOGIC (Existing functionality)
     else:
         if args.files:
@@ -476,46 +1334,20 @@ def main():
             
             for file_path in args.files:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        filepath_str = file_path
-                        console.print(f"\n[bold yellow][ANALYZE] {filepath_str}[/bold yellow]")
-                        code_to_review = f.read()
+                    console.print(f"\n[bold yellow][ANALYZE] {file_path}[/bold yellow]")
+                    code_to_review = _read_source(file_path)
 
-                        if not code_to_review.strip():
-                            console.print("[italic][SKIP] Empty file or input, skipping...[/italic]")
-                            continue
-                        
-                        console.print("[cyan][STREAMING] Live code review starting...[/cyan]")
-                        # Live reviewing with real-time updates
-                        if no_emoji:
-                            # For pre-commit: just collect and print without Rich display
-                            full_text = ""
-                            for chunk in get_ollama_review(code_to_review, custom_rules):
-                                full_text += chunk
-                            # Print directly to stdout with error handling
-                            try:
-                                sys.stdout.write(full_text)
-                                sys.stdout.flush()
-                            except UnicodeEncodeError:
-                                # Fallback: encode with replacement characters
-                                sys.stdout.buffer.write(full_text.encode('utf-8', errors='replace'))
-                                sys.stdout.flush()
-                        else:
-                            # Normal mode: Live streaming display
-                            with Live("", console=console, refresh_per_second=8) as live:
-                                full_text = ""
-                                chunk_count = 0
-                                for chunk in get_ollama_review(code_to_review, custom_rules):
-                                    chunk_count += 1
-                                    full_text += chunk
-                                    # Update display in real-time
-                                    live.update(full_text)
-                                
-                                if args.verbose:
-                                    console.print(f"\n[cyan]DEBUG: Received {chunk_count} chunks[/cyan]")
-                        
-                        console.print("[green][OK] Review complete[/green]")
-                        parse_and_save_review(file_path, full_text)
+                    if not code_to_review.strip():
+                        console.print("[italic][SKIP] Empty file or input, skipping...[/italic]")
+                        continue
+
+                    console.print("[cyan][STREAMING] Live code review starting...[/cyan]")
+                    full_text = _consume_review(
+                        cached_review(code_to_review, custom_rules, stream=not no_emoji),
+                        no_emoji=no_emoji, console=console, verbose=args.verbose)
+
+                    console.print("[green][OK] Review complete[/green]")
+                    parse_and_save_review(file_path, full_text)
                 except Exception as e:
                     console.print(f"[red][ERROR] Error processing file {file_path}: {e}[/red]")
             return
@@ -529,33 +1361,10 @@ def main():
             console.print("\n[bold yellow][ANALYZE] Analyzing standard input (stdin)[/bold yellow]")
             console.print("[cyan][STREAMING] Live code review starting...[/cyan]\n")
             
-            if no_emoji:
-                # For pre-commit: just collect and print without Rich display
-                full_text = ""
-                for chunk in get_ollama_review(code_to_review, custom_rules):
-                    full_text += chunk
-                # Print directly to stdout with error handling
-                try:
-                    sys.stdout.write(full_text)
-                    sys.stdout.flush()
-                except UnicodeEncodeError:
-                    # Fallback: encode with replacement characters
-                    sys.stdout.buffer.write(full_text.encode('utf-8', errors='replace'))
-                    sys.stdout.flush()
-            else:
-                # Normal mode: Live streaming display
-                with Live("", console=console, refresh_per_second=8) as live:
-                    full_text = ""
-                    chunk_count = 0
-                    for chunk in get_ollama_review(code_to_review, custom_rules):
-                        chunk_count += 1
-                        full_text += chunk
-                        # Update display in real-time
-                        live.update(full_text)
-                
-                if args.verbose:
-                    console.print(f"\n[cyan]DEBUG: Received {chunk_count} chunks[/cyan]")
-            
+            full_text = _consume_review(
+                cached_review(code_to_review, custom_rules, stream=not no_emoji),
+                no_emoji=no_emoji, console=console, verbose=args.verbose)
+
             console.print("\n[green][OK] Review complete[/green]")
             parse_and_save_review("stdin", full_text)
         else: